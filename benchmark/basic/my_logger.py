@@ -1,5 +1,8 @@
 import os
+import queue
+import atexit
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
 from rich.logging import RichHandler
 
@@ -40,7 +43,21 @@ def create_file_logger(name=None):
     file_handler.setFormatter(logging.Formatter(
         '%(asctime)s - %(levelname)s - %(message)s'
     ))
-    log.addHandler(file_handler)
+
+    # Per-request lines are emitted from hot paths; route them through a
+    # QueueHandler so emit() is a plain enqueue and the formatting + file
+    # write happen on a background listener thread instead of under the
+    # logging lock
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setLevel(logging.DEBUG)
+    log.addHandler(queue_handler)
+    # Keep a reference so the listener isn't garbage collected
+    log._queue_listener = listener
 
     return log
 
@@ -1,40 +1,50 @@
 import os
 import time
+import random
+import logging
 import functools
 from benchmark.basic import client
-from decorator import decorator
-from benchmark.basic.my_logger import logger
+from benchmark.basic.my_logger import logger, DEBUG
 
 TIMER = os.environ.get("TIMER", "0") == "1"
 
 
-@decorator
-def wait_task(func, callback=None, timeout=120, task_type="ML", *args, **kw):
-    res = func(*args, **kw)
-    if "task_id" not in res:
-        return res
-    task_id = res["task_id"]
-    if is_complete(res):
-        return res
+def wait_task(func=None, callback=None, timeout=120, task_type="ML"):
+    if func is None:
+        return functools.partial(wait_task, callback=callback, timeout=timeout, task_type=task_type)
 
-    uri = None
-    if task_type == "ML":
-        uri = "/_plugins/_ml/tasks/{}".format(task_id)
-    startTime = time.time()
-    while True:
-        task_res = client.http.get(uri)
-        if is_complete(task_res):
-            if callback is not None:
-                callback_obj = args[0]
-                actual_callback = getattr(callback_obj, callback.__name__, None)
-                if actual_callback is not None:
-                    actual_callback(task_res)
-            break
-        time.sleep(5)
-        elapsedTime = time.time() - startTime
-        if elapsedTime > timeout:
-            break
-    return res
+    @functools.wraps(func)
+    def wrapper(*args, **kw):
+        res = func(*args, **kw)
+        if "task_id" not in res:
+            return res
+        task_id = res["task_id"]
+        if is_complete(res):
+            return res
+
+        uri = None
+        if task_type == "ML":
+            uri = "/_plugins/_ml/tasks/{}".format(task_id)
+        startTime = time.time()
+        # Exponential backoff with jitter: short tasks complete within a
+        # sub-second poll, long tasks aren't hammered every 5s
+        poll_interval = 0.5
+        while True:
+            task_res = client.http.get(uri)
+            if is_complete(task_res):
+                if callback is not None:
+                    callback_obj = args[0]
+                    actual_callback = getattr(callback_obj, callback.__name__, None)
+                    if actual_callback is not None:
+                        actual_callback(task_res)
+                break
+            time.sleep(random.uniform(0.5, poll_interval))
+            poll_interval = min(10.0, poll_interval * 1.5)
+            elapsedTime = time.time() - startTime
+            if elapsedTime > timeout:
+                break
+        return res
+    return wrapper
 
 def is_complete(res):
     if "status" in res and res["status"] == "COMPLETED":
@@ -44,36 +54,52 @@ def is_complete(res):
     return False
 
 
-@decorator
-def trace(func, *args, **kw):
-    logger.debug(f"before run: {func.__module__}:{func.__qualname__}")
-    startTime = time.time()
-    res = func(*args, **kw)
-    elapsedTime = time.time() - startTime
-    if TIMER:
-        logger.info(f"{func.__qualname__} elapsed time: {elapsedTime:.2f} seconds")
-    logger.debug(f"after run: {func.__module__}:{func.__qualname__}")
-    logger.debug(f"result: {res}")
-    return res
-   
+def trace(func):
+    # Production load-test mode: nothing to log or time, so leave the
+    # function unwrapped and pay zero overhead per call
+    if not TIMER and not DEBUG:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kw):
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            logger.debug(f"before run: {func.__module__}:{func.__qualname__}")
+        startTime = time.time()
+        res = func(*args, **kw)
+        elapsedTime = time.time() - startTime
+        if TIMER:
+            logger.info(f"{func.__qualname__} elapsed time: {elapsedTime:.2f} seconds")
+        if debug_enabled:
+            logger.debug(f"after run: {func.__module__}:{func.__qualname__}")
+            logger.debug(f"result: {res}")
+        return res
+    return wrapper
+
 
 def parser(obj, keys):
     def get(obj, key):
         if isinstance(obj, list):
+            # Walk nested lists with an explicit stack instead of recursing
+            # per element; large responses (e.g. _segments) get deep
             ret = []
-            for o in obj:
-                try:
-                    ret.append(get(o, key))
-                except KeyError:
-                    pass
+            stack = list(reversed(obj))
+            while stack:
+                item = stack.pop()
+                if isinstance(item, list):
+                    stack.extend(reversed(item))
+                elif key == "*":
+                    ret.extend(item.values())
+                elif key in item:
+                    ret.append(item[key])
             if len(ret) == 0:
-                raise KeyError
+                raise KeyError(key)
             return ret
         else:
             if key == "*":
                 return list(obj.values())
             if key not in obj:
-                raise KeyError
+                raise KeyError(key)
             return obj[key]
 
     for key in keys:
@@ -83,37 +109,42 @@ def parser(obj, keys):
     return flatten(obj)
 
 def flatten(obj):
-    if isinstance(obj, list):
-        ret = []
-        for i in obj:
-            r = flatten(i)
-            if isinstance(r, list):
-                ret = ret + r
-            else:
-                ret.append(flatten(i))
-        return ret
-    else:
+    if not isinstance(obj, list):
         return obj
+    ret = []
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, list):
+            stack.extend(reversed(item))
+        else:
+            ret.append(item)
+    return ret
 
 
-@decorator
-def swallow_exceptions(func, exceptions=None, *args, **kw):
+def swallow_exceptions(func=None, exceptions=None):
     """
     Decorator to swallow exceptions.
-    
+
     Args:
         func: The function to decorate
         exceptions: List of exception types to catch. If None, catches all exceptions.
-    
+
     Returns:
         The result of the function or None if an exception occurred
     """
-    try:
-        return func(*args, **kw)
-    except Exception as e:
-        if exceptions is None or any(isinstance(e, exc) for exc in exceptions):
-            logger.error(f"Swallowed exception in {func.__qualname__}: {str(e)}")
-            return None
-        else:
-            raise
+    if func is None:
+        return functools.partial(swallow_exceptions, exceptions=exceptions)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kw):
+        try:
+            return func(*args, **kw)
+        except Exception as e:
+            if exceptions is None or any(isinstance(e, exc) for exc in exceptions):
+                logger.error(f"Swallowed exception in {func.__qualname__}: {str(e)}")
+                return None
+            else:
+                raise
+    return wrapper
 
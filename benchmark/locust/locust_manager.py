@@ -2,15 +2,29 @@
 LocustManager: Producer that manages a bounded queue and feeds bulk payloads
 to LocustRunner consumers using true multiprocessing.
 """
-import json
 import time
 import signal
 import threading
-from multiprocessing import Manager
+import queue as thread_queue
+from multiprocessing import Queue
+from queue import Empty
 from typing import Iterator, Tuple, Any
 from benchmark.locust.locust_runner import LocustRunner
 from benchmark.workload.tasks.runner_type import RunnerType
 
+try:
+    import orjson
+
+    def _json_dumps(obj):
+        # OPT_SERIALIZE_NUMPY: sparse-vector generators can hand us numpy
+        # scalars inside doc bodies
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+except ImportError:
+    import json
+
+    def _json_dumps(obj):
+        return json.dumps(obj).encode()
+
 
 class LocustManager:
     """
@@ -42,12 +56,31 @@ class LocustManager:
         self.queue_size = int(params.get('queue_size', queue_size))
         self.bulk_size = int(params.get('bulk_size', bulk_size))
         self.max_retries = int(params.get('max_retries', max_retries))
-        self.queue = Manager().Queue(maxsize=self.queue_size)
+        self.search_put_batch = int(params.get('search_put_batch', 32))
+        # The index name is constant for the life of the manager, so the
+        # bulk action line is pre-encoded once instead of per document
+        self._action_prefix = b'{"index":{"_index":' + _json_dumps(self.index_name) + b',"_id":"'
+        self._action_suffix = b'"}}\n'
+        # Schema-specialized body encoder, derived from the first document
+        self._encode_body = None
+        # Reusable assembly buffer for _create_bulk_body: clear() keeps
+        # the underlying allocation, so after the first bulk the producer
+        # stops paying a multi-MB malloc/free per batch. The queue ships
+        # an immutable bytes copy, so reuse here is safe.
+        self._body_buf = bytearray()
+        # Raw mp.Queue (pipe + semaphore) instead of a Manager proxy: a
+        # Manager queue funnels every put/get through a separate process
+        # over pickle RPC, serializing each bulk payload twice. run()
+        # re-shards this into one queue per ~8 workers to avoid all
+        # consumers contending on a single queue lock.
+        self.queues = [Queue(maxsize=self.queue_size)]
+        self._put_count = 0
         self._total_produced = 0
         self._is_producing = False
         self._stop_requested = False
         self.runner: LocustRunner = None
         self._progress_start_time = None
+        self._last_progress_time = 0.0
 
         # Store original signal handler
         self._original_sigint = None
@@ -57,37 +90,112 @@ class LocustManager:
     def set_runner_type(self, runner_type):
         self.runner_type = runner_type
 
-    def _create_bulk_body(self, docs: list[Tuple[Any, dict]]) -> str:
-        """Create NDJSON bulk request body from documents."""
-        lines = []
-        for doc_id, doc_body in docs:
-            action = {"index": {"_index": self.index_name, "_id": str(doc_id)}}
-            lines.append(json.dumps(action))
-            lines.append(json.dumps(doc_body))
-        lines.append("")
-        return '\n'.join(lines)
+    def _next_queue(self) -> Queue:
+        """Pick the next queue shard, round-robin."""
+        queue = self.queues[self._put_count % len(self.queues)]
+        self._put_count += 1
+        return queue
+
+    def _build_body_encoder(self, sample: Any):
+        """Build a body encoder specialized to the sample document's schema.
+
+        Benchmark docs share one fixed schema, so the object keys can be
+        pre-encoded once and only the values serialized per document. Docs
+        that deviate from the sampled schema fall back to the generic encoder.
+        """
+        if not isinstance(sample, dict) or not sample:
+            return _json_dumps
+
+        keys = tuple(sample.keys())
+        prefixes = []
+        for i, key in enumerate(keys):
+            sep = b'{' if i == 0 else b','
+            prefixes.append(sep + _json_dumps(key) + b':')
+
+        def encode(doc, _keys=keys, _prefixes=prefixes, _dumps=_json_dumps):
+            if not isinstance(doc, dict) or tuple(doc.keys()) != _keys:
+                return _dumps(doc)
+            buf = bytearray()
+            for prefix, key in zip(_prefixes, _keys):
+                buf += prefix
+                buf += _dumps(doc[key])
+            buf += b'}'
+            return bytes(buf)
+
+        return encode
+
+    def _create_bulk_body(self, docs: list[Tuple[Any, dict]], length: int = None) -> Tuple[bytes, list]:
+        """Create NDJSON bulk request body from the first `length` documents.
+
+        Uses orjson and a single bytearray accumulator; the producer
+        feeds every worker, so per-doc encoding cost matters here. The
+        docs list may be a reused buffer that is only valid up to `length`.
+
+        Returns:
+            (body, offsets) - offsets[i]:offsets[i+1] is the byte span of
+            doc i's action+body pair, so the retry path can slice failed
+            docs out without re-splitting the whole body.
+        """
+        if length is None:
+            length = len(docs)
+        if self._encode_body is None:
+            self._encode_body = self._build_body_encoder(docs[0][1])
+        encode_body = self._encode_body
+
+        buf = self._body_buf
+        buf.clear()
+        offsets = [0]
+        for i in range(length):
+            doc_id, doc_body = docs[i]
+            buf += self._action_prefix
+            buf += str(doc_id).encode()
+            buf += self._action_suffix
+            # Generators that read JSONL can hand us already-serialized
+            # JSON; splice it in without a decode/encode round-trip
+            if isinstance(doc_body, (bytes, bytearray)):
+                buf += doc_body
+            else:
+                buf += encode_body(doc_body)
+            buf += b'\n'
+            offsets.append(len(buf))
+        return bytes(buf), offsets
 
     def _handle_sigint(self, signum, frame):
-        """Handle Ctrl+C by stopping all workers immediately."""
+        """Handle Ctrl+C by requesting a stop.
+
+        Only flags are flipped here: terminating workers or touching the
+        queues from inside a signal handler can interrupt a Queue.put
+        mid-write and corrupt the pipe. run() notices the flags between
+        batches and shuts down on the normal path, and the original
+        handler is restored in run()'s finally block.
+        """
         print("\nReceived Ctrl+C, stopping workers...")
         self._stop_requested = True
         if self.runner:
-            self.runner.stop(force=True)
-        # Restore original handler
-        signal.signal(signal.SIGINT, self._original_sigint)
+            self.runner.stop_signal.value = True
 
     def _print_progress(self, current: int, total: int):
-        """Print progress bar with ETA to terminal."""
+        """Print progress bar with ETA to terminal (throttled to ~10 Hz)."""
+        # monotonic: a wall-clock step (NTP) must not break the throttle
+        now = time.monotonic()
         if self._progress_start_time is None:
-            self._progress_start_time = time.time()
-        
+            self._progress_start_time = now
+            self._last_progress_time = 0.0
+
+        # Formatting + a flushed stdout write per doc serializes the
+        # producer behind tty I/O; skip unless enough time has passed
+        # (always emit the final update)
+        if current < total and now - self._last_progress_time < 0.1:
+            return
+        self._last_progress_time = now
+
         percent = current / total * 100
         bar_length = 40
         filled = int(bar_length * current / total)
         bar = '█' * filled + '░' * (bar_length - filled)
         
         # Calculate ETA
-        elapsed_time = time.time() - self._progress_start_time
+        elapsed_time = now - self._progress_start_time
         if current > 0 and elapsed_time > 0:
             rate = current / elapsed_time
             remaining = total - current
@@ -109,10 +217,42 @@ class LocustManager:
         
         print(f'\rProgress: [{bar}] {percent:.1f}% ({current}/{total}) ETA: {eta_str}', end='', flush=True)
 
+    def _prefetch(self, data_generator: Iterator[Tuple[Any, dict]]) -> Iterator[Tuple[Any, dict]]:
+        """Pull from the generator on a background thread.
+
+        Workload generators are usually file-bound (JSONL / sparse matrix
+        reads); running them on their own thread overlaps that I/O with
+        body encoding and queue puts in the producer loop.
+        """
+        buf = thread_queue.Queue(maxsize=self.bulk_size * 4)
+        done = object()
+
+        def reader():
+            try:
+                for item in data_generator:
+                    if self._stop_requested:
+                        break
+                    buf.put(item)
+                buf.put(done)
+            except BaseException as e:  # re-raised on the consumer side
+                buf.put(e)
+
+        threading.Thread(target=reader, daemon=True, name='generator-prefetch').start()
+        while True:
+            item = buf.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
     def _produce_batch(self, data_generator: Iterator[Tuple[Any, dict]], block: bool = True, total_count: int = None):
-        batch = []
+        # Preallocate one batch buffer and fill by index; recreating a
+        # list per bulk churns the allocator for nothing
+        batch = [None] * self.bulk_size
+        idx = 0
         show_progress = total_count is not None and total_count > 0
-        
+
         # Reset progress tracking for new run
         if show_progress:
             self._progress_start_time = None
@@ -120,37 +260,35 @@ class LocustManager:
         for doc_id, doc_body in data_generator:
             if self._stop_requested:
                 break
-            batch.append((doc_id, doc_body))
+            batch[idx] = (doc_id, doc_body)
+            idx += 1
 
-            if len(batch) >= self.bulk_size:
-                payload = {
-                    'body': self._create_bulk_body(batch),
-                    'doc_count': len(batch),
-                    'retry_count': 0
-                }
+            if idx == self.bulk_size:
+                body, offsets = self._create_bulk_body(batch, idx)
+                # Plain tuple: retries are local to the worker, so the
+                # queue contract carries no retry_count, and a tuple
+                # pickles smaller and faster than a keyed dict
+                payload = (body, offsets, idx)
 
+                queue = self._next_queue()
                 if block:
-                    self.queue.put(payload)
-                    self._total_produced += len(batch)
+                    queue.put(payload)
+                    self._total_produced += idx
                 else:
-                    if not self.queue.full():
-                        self.queue.put(payload)
-                        self._total_produced += len(batch)
+                    if not queue.full():
+                        queue.put(payload)
+                        self._total_produced += idx
 
                 if show_progress:
                     self._print_progress(self._total_produced, total_count)
 
-                batch = []
+                idx = 0
 
         # Handle remaining docs
-        if batch and len(batch) > 0 and not self._stop_requested:
-            payload = {
-                'body': self._create_bulk_body(batch),
-                'doc_count': len(batch),
-                'retry_count': 0
-            }
-            self.queue.put(payload, block=block)
-            self._total_produced += len(batch)
+        if idx > 0 and not self._stop_requested:
+            body, offsets = self._create_bulk_body(batch, idx)
+            self._next_queue().put((body, offsets, idx), block=block)
+            self._total_produced += idx
 
             if show_progress:
                 self._print_progress(self._total_produced, total_count)
@@ -160,24 +298,32 @@ class LocustManager:
 
     def _produce_single(self, data_generator: Iterator[Tuple[Any, dict]], block: bool = True, total_count: int = None):
         show_progress = total_count is not None and total_count > 0
-        
+
         # Reset progress tracking for new run
         if show_progress:
             self._progress_start_time = None
 
+        # One put per doc costs a pickle+IPC round-trip per query, so
+        # search payloads are shipped in mini-batches
+        mini_batch = []
         for doc_id, doc_body in data_generator:
             if self._stop_requested:
                 break
 
-            payload = {
-                'body': doc_body,
-                'doc_count': 1,
-                'retry_count': 0,
-                'doc_id': doc_id
-            }
+            mini_batch.append((doc_id, doc_body))
+
+            if len(mini_batch) >= self.search_put_batch:
+                self._next_queue().put(mini_batch)
+                self._total_produced += len(mini_batch)
+                mini_batch = []
 
-            self.queue.put(payload)
-            self._total_produced += 1
+                if show_progress:
+                    self._print_progress(self._total_produced, total_count)
+
+        # Handle remaining docs
+        if mini_batch and not self._stop_requested:
+            self._next_queue().put(mini_batch, block=block)
+            self._total_produced += len(mini_batch)
 
             if show_progress:
                 self._print_progress(self._total_produced, total_count)
@@ -196,6 +342,7 @@ class LocustManager:
             total_count: Total number of documents (for progress bar). If None, no progress bar.
         """
         self._is_producing = True
+        data_generator = self._prefetch(data_generator)
         if self.runner_type == RunnerType.INGEST:
             self._produce_batch(data_generator, block, total_count)
         elif self.runner_type == RunnerType.SEARCH or self.runner_type == RunnerType.SEARCH_WITH_RECALL:
@@ -232,12 +379,21 @@ class LocustManager:
         self._stop_requested = False
         self._is_producing = False
         
-        # Clear any leftover items in the queue from previous runs
-        while not self.queue.empty():
-            try:
-                self.queue.get_nowait()
-            except Exception:
-                break
+        # One queue per ~8 workers: a single shared queue serializes all
+        # consumers on its lock once worker counts grow
+        num_shards = max(1, user_count // 8)
+        if num_shards != len(self.queues):
+            self.queues = [Queue(maxsize=self.queue_size) for _ in range(num_shards)]
+        self._put_count = 0
+
+        # Clear any leftover items in the queues from previous runs;
+        # empty() is unreliable on mp.Queue, so drain until Empty
+        for queue in self.queues:
+            while True:
+                try:
+                    queue.get_nowait()
+                except Empty:
+                    break
 
         # Setup signal handler for Ctrl+C
         self._original_sigint = signal.signal(signal.SIGINT, self._handle_sigint)
@@ -245,7 +401,7 @@ class LocustManager:
         try:
             # Create and start runner with worker processes
             self.runner = LocustRunner(
-                payload_queue=self.queue,
+                payload_queues=self.queues,
                 index_name=self.index_name,
                 max_retries=self.max_retries,
                 num_workers=user_count,
@@ -258,30 +414,26 @@ class LocustManager:
                 print(f"Warning: Not all workers started within timeout")
             print(f"All {self.runner.ready_count.value} consumers ready, starting to produce...")
 
-            # Start producer in background thread
-            producer_thread = threading.Thread(
-                target=self.produce,
-                args=(data_generator,),
-                kwargs={'block': True, 'total_count': total_count}
-            )
-            producer_thread.start()
+            # Produce directly on the main thread: the old background
+            # thread was joined immediately after starting, so it bought
+            # no overlap, only GIL handoffs per queue.put. Workers run in
+            # their own processes and consume concurrently regardless.
+            self.produce(data_generator, block=True, total_count=total_count)
+
 
-            # Wait for producer to finish
-            producer_thread.join()
-            
             if self._stop_requested:
                 print("Stopped by user")
             else:
                 print("Producer finished, waiting for queue to drain...")
 
                 if wait_for_completion:
-                    # Wait for queue to drain
-                    while not self.queue.empty() and not self._stop_requested:
-                        time.sleep(0.5)
-
-                    # Give workers time to finish processing last items
-                    if not self._stop_requested:
-                        time.sleep(2)
+                    # One sentinel per worker, placed on its home shard; each
+                    # worker exits once it has consumed everything queued
+                    # ahead of its sentinel, so no empty() polling or fixed
+                    # trailing sleep is needed
+                    for i in range(user_count):
+                        self.queues[i % len(self.queues)].put(None)
+                    self.runner.join_workers()
 
             # Stop workers
             self.runner.stop()
@@ -310,6 +462,6 @@ class LocustManager:
 
     @property
     def queue_size_current(self) -> int:
-        return self.queue.qsize()
+        return sum(queue.qsize() for queue in self.queues)
 
 
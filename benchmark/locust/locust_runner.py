@@ -3,22 +3,35 @@ LocustRunner: Multi-process consumer that processes bulk payloads from a Queue
 and makes bulk requests to OpenSearch with retry logic.
 Uses true multiprocessing for parallel execution.
 """
+import os
 import time
 import pickle
+import random
+import signal
+import orjson
 from dataclasses import dataclass, field
 from multiprocessing import Process, Manager, Queue, Value, Manager
 from queue import Empty
 from ctypes import c_bool, c_int
 from typing import Dict, Any, Optional, List
 from opensearchpy.exceptions import OpenSearchException
-from benchmark.basic import client
-from benchmark.basic.my_logger import file_logger
+from benchmark.basic import client, get_client
+from benchmark.basic.my_logger import file_logger, create_file_logger
 from benchmark.workload.tasks.runner_type import RunnerType
 
 
 @dataclass
 class RunnerMetrics:
-    """Metrics collected by each worker process."""
+    """Metrics collected by each worker process.
+
+    Latency and took samples are kept in fixed-size reservoirs so a
+    multi-million-doc run doesn't accumulate one float per request per
+    worker; averages come from exact running sums.
+    """
+
+    RESERVOIR_SIZE = 10_000
+    ERRORS_MAX = 100
+
     runner_id: int
     success_count: int = 0
     fail_count: int = 0
@@ -26,12 +39,54 @@ class RunnerMetrics:
     request_count: int = 0
     total_docs: int = 0
     latencies: List[float] = field(default_factory=list)
+    latency_sum: float = 0.0
+    latency_count: int = 0
+    latency_min: float = 0.0
+    latency_max: float = 0.0
     errors: List[str] = field(default_factory=list)
+    error_count: int = 0
     start_time: float = 0
     end_time: float = 0
     took_times: List[int] = field(default_factory=list)  # OpenSearch query "took" times
+    took_sum: float = 0.0
+    took_count: int = 0
     search_ids: Dict[str, List[str]] = field(default_factory=dict)
 
+    @staticmethod
+    def _reservoir_add(samples: list, seen: int, value: float):
+        """Standard reservoir sampling: keep a uniform sample of size k."""
+        if len(samples) < RunnerMetrics.RESERVOIR_SIZE:
+            samples.append(value)
+        else:
+            j = random.randrange(seen)
+            if j < RunnerMetrics.RESERVOIR_SIZE:
+                samples[j] = value
+
+    def record_latency(self, elapsed_ms: float):
+        self.latency_sum += elapsed_ms
+        self.latency_count += 1
+        if self.latency_count == 1 or elapsed_ms < self.latency_min:
+            self.latency_min = elapsed_ms
+        if elapsed_ms > self.latency_max:
+            self.latency_max = elapsed_ms
+        self._reservoir_add(self.latencies, self.latency_count, elapsed_ms)
+
+    def record_error(self, error):
+        """Count every error but keep only the first ERRORS_MAX messages.
+
+        A long run against a struggling cluster can fail millions of
+        requests; an unbounded message list would dominate worker memory
+        and stall collect_metrics on the end-of-run pickle.
+        """
+        self.error_count += 1
+        if len(self.errors) < self.ERRORS_MAX:
+            self.errors.append(str(error))
+
+    def record_took(self, took_ms: float):
+        self.took_sum += took_ms
+        self.took_count += 1
+        self._reservoir_add(self.took_times, self.took_count, took_ms)
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert metrics to dictionary.
         """
@@ -47,17 +102,25 @@ class RunnerMetrics:
             "total_docs": self.total_docs,
             "duration_sec": duration,
             "throughput": self.total_docs / duration if duration > 0 else 0,
-            "avg_latency_ms": sum(latencies) / len(latencies) if latencies else 0,
-            "min_latency_ms": min(latencies) if latencies else 0,
-            "max_latency_ms": max(latencies) if latencies else 0,
+            "avg_latency_ms": self.latency_sum / self.latency_count if self.latency_count else 0,
+            "min_latency_ms": self.latency_min,
+            "max_latency_ms": self.latency_max,
             "p50_latency_ms": latencies[int(len(latencies) * 0.5)] if latencies else 0,
             "p95_latency_ms": latencies[int(len(latencies) * 0.95)] if len(latencies) > 1 else latencies[0] if latencies else 0,
             "p99_latency_ms": latencies[int(len(latencies) * 0.99)] if len(latencies) > 1 else latencies[0] if latencies else 0,
-            "error_count": len(self.errors),
+            "error_count": self.error_count,
+            # Raw reservoir + running sums so collect_metrics can compute
+            # real global percentiles instead of reconstructing from avgs
+            "latency_samples": self.latencies,
+            "latency_sum": self.latency_sum,
+            "latency_count": self.latency_count,
         }
         # Add took metrics only if we have search data
         if took_times:
-            result["avg_took_ms"] = sum(took_times) / len(took_times)
+            result["avg_took_ms"] = self.took_sum / self.took_count if self.took_count else 0
+            result["took_samples"] = self.took_times
+            result["took_sum"] = self.took_sum
+            result["took_count"] = self.took_count
             result["p50_took_ms"] = took_times[int(len(took_times) * 0.5)]
             result["p95_took_ms"] = took_times[int(len(took_times) * 0.95)] if len(took_times) > 1 else took_times[0]
             result["p99_took_ms"] = took_times[int(len(took_times) * 0.99)] if len(took_times) > 1 else took_times[0]
@@ -67,17 +130,46 @@ class RunnerMetrics:
         return result
 
 
-def _extract_failed_docs(bulk_body: str, response: Dict) -> tuple[Optional[str], int]:
-    """Extract failed documents from bulk response for retry."""
+def _extract_failed_docs(
+    bulk_body: bytes,
+    response: Dict,
+    doc_offsets: Optional[list] = None
+) -> tuple[Optional[bytes], int, Optional[list]]:
+    """Extract failed documents from bulk response for retry.
+
+    Operates on the NDJSON body as bytes so the retry path never pays a
+    decode/encode round-trip. When the producer's per-doc byte offsets
+    are available, failed docs are sliced straight out of the body with
+    no full split; otherwise fall back to splitting on newlines.
+
+    Returns:
+        (failed_body, failed_count, failed_offsets)
+    """
     if not response.get('errors'):
-        return None, 0
+        return None, 0, None
 
-    lines = bulk_body.strip().split('\n')
-    failed_lines = []
+    if isinstance(bulk_body, str):
+        bulk_body = bulk_body.encode()
     failed_count = 0
 
+    if doc_offsets is not None:
+        failed = bytearray()
+        failed_offsets = [0]
+        for i, item in enumerate(response.get('items', [])):
+            action = next(iter(item))
+            if item[action].get('error'):
+                failed_count += 1
+                failed += bulk_body[doc_offsets[i]:doc_offsets[i + 1]]
+                failed_offsets.append(len(failed))
+        if failed_count == 0:
+            return None, 0, None
+        return bytes(failed), failed_count, failed_offsets
+
+    lines = bulk_body.strip().split(b'\n')
+    failed_lines = []
+
     for i, item in enumerate(response.get('items', [])):
-        action = list(item.keys())[0]
+        action = next(iter(item))
         if item[action].get('error'):
             failed_count += 1
             action_idx = i * 2
@@ -85,8 +177,8 @@ def _extract_failed_docs(bulk_body: str, response: Dict) -> tuple[Optional[str],
                 failed_lines.append(lines[action_idx])
                 failed_lines.append(lines[action_idx + 1])
 
-    failed_body = '\n'.join(failed_lines) + '\n' if failed_lines else None
-    return failed_body, failed_count
+    failed_body = b'\n'.join(failed_lines) + b'\n' if failed_lines else None
+    return failed_body, failed_count, None
 
 
 def _execute_bulk_with_retry(
@@ -95,7 +187,8 @@ def _execute_bulk_with_retry(
     bulk_body: str,
     doc_count: int,
     max_retries: int,
-    metrics: RunnerMetrics
+    metrics: RunnerMetrics,
+    doc_offsets: Optional[list] = None
 ):
     """
     Execute bulk request with local retry logic.
@@ -103,24 +196,35 @@ def _execute_bulk_with_retry(
     """
     current_body = bulk_body
     current_doc_count = doc_count
+    current_offsets = doc_offsets
     retry_count = 0
 
     while current_body and retry_count <= max_retries:
-        start_time = time.time()
+        # perf_counter_ns is monotonic, hits the vDSO fast path on Linux
+        # and stays integer until the single ms conversion below
+        t0 = time.perf_counter_ns()
         try:
+            # filter_path keeps items.*.status on every item so array
+            # positions stay aligned with the request (needed for retry
+            # index math) while dropping _id/_version/_shards/result,
+            # which is most of the response on successful bulks
             response = client.bulk(
                 index=index_name,
                 body=current_body,
-                params={'refresh': 'false'}
+                params={
+                    'refresh': 'false',
+                    'filter_path': 'errors,items.*.status,items.*.error'
+                }
             )
-            elapsed_ms = (time.time() - start_time) * 1000
-            metrics.latencies.append(elapsed_ms)
+            elapsed_ms = (time.perf_counter_ns() - t0) / 1e6
+            metrics.record_latency(elapsed_ms)
             metrics.request_count += 1
             metrics.total_docs += current_doc_count
 
             if response.get('errors'):
                 file_logger.error(response)
-                failed_body, failed_count = _extract_failed_docs(current_body, response)
+                failed_body, failed_count, failed_offsets = _extract_failed_docs(
+                    current_body, response, current_offsets)
                 success_count = current_doc_count - failed_count
                 metrics.success_count += success_count
 
@@ -128,6 +232,7 @@ def _execute_bulk_with_retry(
                     # Retry locally with failed docs only
                     current_body = failed_body
                     current_doc_count = failed_count
+                    current_offsets = failed_offsets
                     retry_count += 1
                     metrics.retry_count += 1
                     file_logger.error(f'{runner_id} retrying {failed_count} failed docs (attempt {retry_count})')
@@ -142,10 +247,10 @@ def _execute_bulk_with_retry(
                 break
 
         except OpenSearchException as e:
-            elapsed_ms = (time.time() - start_time) * 1000
-            metrics.latencies.append(elapsed_ms)
+            elapsed_ms = (time.perf_counter_ns() - t0) / 1e6
+            metrics.record_latency(elapsed_ms)
             metrics.request_count += 1
-            metrics.errors.append(str(e))
+            metrics.record_error(e)
 
             if retry_count < max_retries:
                 retry_count += 1
@@ -167,20 +272,20 @@ def _execute_search(
     """
     Execute a single search request with retry logic.
     """
-    start_time = time.time()
+    t0 = time.perf_counter_ns()
     try:
         response = client.search(
             index=index_name,
             body=query_body
         )
-        elapsed_ms = (time.time() - start_time) * 1000
-        metrics.latencies.append(elapsed_ms)
+        elapsed_ms = (time.perf_counter_ns() - t0) / 1e6
+        metrics.record_latency(elapsed_ms)
         metrics.request_count += 1
         metrics.total_docs += 1
         metrics.success_count += 1
         # Capture the "took" time from OpenSearch response
         if response and 'took' in response:
-            metrics.took_times.append(response['took'])
+            metrics.record_took(response['took'])
 
         if with_recall and response and 'hits' in response and 'hits' in response['hits']:
             results = response['hits']['hits']
@@ -192,18 +297,121 @@ def _execute_search(
         return response
 
     except OpenSearchException as e:
-        elapsed_ms = (time.time() - start_time) * 1000
-        metrics.latencies.append(elapsed_ms)
+        elapsed_ms = (time.perf_counter_ns() - t0) / 1e6
+        metrics.record_latency(elapsed_ms)
         metrics.request_count += 1
-        metrics.errors.append(str(e))
+        metrics.record_error(e)
         metrics.fail_count += 1
         metrics.total_docs += 1
         return None
 
 
+def _execute_msearch(
+    runner_id: int,
+    index_name: str,
+    queries: list,
+    metrics: RunnerMetrics,
+    with_recall: bool
+):
+    """
+    Execute a mini-batch of queries in a single _msearch round-trip.
+    Per-query took/hits are split back out of the responses array.
+    """
+    buf = bytearray()
+    for _, body in queries:
+        if isinstance(body, str):
+            body = body.encode()
+        if isinstance(body, (bytes, bytearray)):
+            # NDJSON requires one line per query body; compact multi-line
+            # payloads (e.g. templated query strings) via a JSON round-trip
+            if b'\n' in body:
+                body = orjson.dumps(orjson.loads(body))
+        else:
+            body = orjson.dumps(body)
+        buf += b'{}\n'
+        buf += body
+        buf += b'\n'
+
+    t0 = time.perf_counter_ns()
+    try:
+        response = client.msearch(
+            index=index_name,
+            body=bytes(buf)
+        )
+    except OpenSearchException as e:
+        elapsed_ms = (time.perf_counter_ns() - t0) / 1e6
+        metrics.record_latency(elapsed_ms)
+        metrics.request_count += 1
+        metrics.record_error(e)
+        metrics.fail_count += len(queries)
+        metrics.total_docs += len(queries)
+        return None
+
+    elapsed_ms = (time.perf_counter_ns() - t0) / 1e6
+    metrics.record_latency(elapsed_ms)
+    metrics.request_count += 1
+
+    responses = response.get('responses', []) if response else []
+    for (doc_id, _), item in zip(queries, responses):
+        metrics.total_docs += 1
+        if item.get('error'):
+            metrics.fail_count += 1
+            metrics.record_error(item['error'])
+            continue
+        metrics.success_count += 1
+        if 'took' in item:
+            metrics.record_took(item['took'])
+
+        if with_recall and 'hits' in item and 'hits' in item['hits']:
+            ids = []
+            for result in item['hits']['hits']:
+                if '_id' in result:
+                    ids.append(int(result['_id']))
+            metrics.search_ids[doc_id] = ids
+    return response
+
+
+def _get_payload(runner_id: int, payload_queues: list, primary: Queue):
+    """
+    Get the next payload from the worker's home shard, stealing from
+    sibling shards when it runs dry.
+
+    Returns:
+        (got, payload) - got is False when every shard was empty
+    """
+    # Short spin on the home shard first: during bursts the next payload
+    # lands within microseconds and get_nowait avoids arming the timeout
+    # machinery at all
+    for _ in range(64):
+        try:
+            return True, primary.get_nowait()
+        except Empty:
+            pass
+
+    num_shards = len(payload_queues)
+    for offset in range(1, num_shards):
+        sibling = payload_queues[(runner_id + offset) % num_shards]
+        try:
+            payload = sibling.get_nowait()
+        except Empty:
+            continue
+        if payload is None:
+            # Another worker's shutdown sentinel - leave it for its owner
+            sibling.put(payload)
+            continue
+        return True, payload
+
+    # Everything was empty: block briefly on the home shard so the
+    # producer wakes us directly instead of a fixed back-off sleep
+    try:
+        return True, primary.get(timeout=0.1)
+    except Empty:
+        return False, None
+
+
 def _worker_process(
     runner_id: int,
-    payload_queue: Queue,
+    payload_queues: list,
     metrics_queue: Queue,
     index_name: str,
     max_retries: int,
@@ -214,8 +422,24 @@ def _worker_process(
     """
     Worker process that consumes bulk payloads and sends to OpenSearch.
     Aggregates metrics locally and sends to metrics_queue when done.
-    Retries are handled locally - never puts data back into payload_queue.
+    Retries are handled locally - never puts data back into the queues.
     """
+    # Only the parent handles Ctrl+C; an interrupt landing while a
+    # worker is inside Queue.get/put can leave the queue lock corrupted.
+    # The parent flips stop_signal instead, which the loop below polls.
+    signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGINT})
+
+    # Rebuild the file logger's handlers: the parent's QueueListener
+    # thread does not survive the fork, so the inherited QueueHandler
+    # would enqueue records into a queue nobody drains and every retry
+    # and failed-bulk line from this worker would be lost
+    create_file_logger('sparse-benchmark')
+
+    # Each worker builds its own client: a forked copy of the parent's
+    # client would share its pooled sockets across processes
+    global client
+    client = get_client(fresh=True)
+
     # Signal that this worker is ready
     with ready_signal.get_lock():
         ready_signal.value += 1
@@ -225,48 +449,65 @@ def _worker_process(
     metrics = RunnerMetrics(runner_id=runner_id)
     metrics.start_time = time.time()
 
+    # Home shard: workers are spread over the queue shards round-robin
+    primary = payload_queues[runner_id % len(payload_queues)]
+
     while not stop_signal.value:
-        try:
-            payload = payload_queue.get(timeout=0.5)
-        except Empty:
-            time.sleep(1)
+        got, payload = _get_payload(runner_id, payload_queues, primary)
+        if not got:
+            # _get_payload already blocked briefly; just re-check
+            # stop_signal and go around
             continue
 
-        bulk_body = payload.get('body', '')
-        doc_count = payload.get('doc_count', 0)
-        doc_id = payload.get('doc_id', 0)
+        if payload is None:
+            # Sentinel from the producer: everything queued ahead of it
+            # has been consumed, so this worker is done
+            break
 
         if runner_type == RunnerType.INGEST:
+            body, doc_offsets, doc_count = payload
             # Handle retries locally - no re-queuing
             _execute_bulk_with_retry(
                 runner_id=runner_id,
                 index_name=index_name,
-                bulk_body=bulk_body,
+                bulk_body=body,
                 doc_count=doc_count,
                 max_retries=max_retries,
-                metrics=metrics
-            )
-        elif runner_type == RunnerType.SEARCH:
-            response = _execute_search(
-                runner_id=runner_id,
-                index_name=index_name,
-                query_body=bulk_body,
                 metrics=metrics,
-                with_recall=False,
-                doc_id=doc_id
-            )
-        elif runner_type == RunnerType.SEARCH_WITH_RECALL:
-            response = _execute_search(
-                runner_id=runner_id,
-                index_name=index_name,
-                query_body=bulk_body,
-                metrics=metrics,
-                with_recall=True,
-                doc_id=doc_id
+                doc_offsets=doc_offsets
             )
+        elif runner_type in (RunnerType.SEARCH, RunnerType.SEARCH_WITH_RECALL):
+            # Search payloads arrive as mini-batches to amortize queue IPC;
+            # batches go out as one _msearch instead of N _search round-trips
+            queries = payload
+            with_recall = runner_type == RunnerType.SEARCH_WITH_RECALL
+            if len(queries) > 1:
+                _execute_msearch(
+                    runner_id=runner_id,
+                    index_name=index_name,
+                    queries=queries,
+                    metrics=metrics,
+                    with_recall=with_recall
+                )
+            else:
+                _execute_search(
+                    runner_id=runner_id,
+                    index_name=index_name,
+                    query_body=queries[0][1],
+                    metrics=metrics,
+                    with_recall=with_recall,
+                    doc_id=queries[0][0]
+                )
+
 
+    # Worker done - flush the file log first: the process can exit via
+    # os._exit, which skips atexit, and an unstopped listener drops the
+    # final failed-bulk/retry lines still sitting in its queue
+    listener = getattr(file_logger, '_queue_listener', None)
+    if listener is not None:
+        listener.stop()
 
-    # Worker done - send aggregated metrics to queue
+    # Send aggregated metrics to queue
     metrics.end_time = time.time()
     metrics_queue.put(metrics.to_dict())
     print(f"LocustRunner {runner_id} stopped")
@@ -280,19 +521,21 @@ class LocustRunner:
 
     def __init__(
         self,
-        payload_queue: Queue,
+        payload_queues: list,
         index_name: str = "test_index",
         max_retries: int = 3,
         num_workers: int = 4,
         runner_type: RunnerType = RunnerType.UNKNOWN
     ):
-        self.payload_queue = payload_queue
+        self.payload_queues = payload_queues
         self.index_name = index_name
         self.max_retries = max_retries
         self.num_workers = num_workers
 
         # Queue for receiving aggregated metrics from workers
         self.metrics_queue = Manager().Queue()
+        # Metrics drained while joining, ahead of collect_metrics
+        self._pending_metrics: list = []
         self.stop_signal = Value(c_bool, False)
         self.ready_count = Value(c_int, 0)
         self.workers: list[Process] = []
@@ -300,12 +543,16 @@ class LocustRunner:
 
     def start(self):
         """Start all worker processes."""
+        # Children inherit this flag and skip the client.info() round-trip
+        # when benchmark.basic re-initializes under the spawn start method
+        previous_flag = os.environ.get('BENCHMARK_WORKER')
+        os.environ['BENCHMARK_WORKER'] = '1'
         for i in range(self.num_workers):
             p = Process(
                 target=_worker_process,
                 args=(
                     i,
-                    self.payload_queue,
+                    self.payload_queues,
                     self.metrics_queue,
                     self.index_name,
                     self.max_retries,
@@ -316,6 +563,10 @@ class LocustRunner:
             )
             p.start()
             self.workers.append(p)
+        if previous_flag is None:
+            os.environ.pop('BENCHMARK_WORKER', None)
+        else:
+            os.environ['BENCHMARK_WORKER'] = previous_flag
 
     def wait_until_ready(self, timeout: float = 30.0) -> bool:
         """Wait until all workers are ready.
@@ -333,6 +584,36 @@ class LocustRunner:
             time.sleep(0.1)
         return True
 
+    def join_workers(self, timeout: float = None) -> bool:
+        """Wait for workers to exit on their own after a sentinel drain.
+
+        Polls liveness with exponential backoff rather than a fixed tick.
+
+        Args:
+            timeout: Maximum time to wait in seconds (None = no limit)
+
+        Returns:
+            True if all workers exited, False if timeout
+        """
+        deadline = time.time() + timeout if timeout else None
+        sleep_s = 0.01
+        while any(p.is_alive() for p in self.workers):
+            # Drain metrics as workers finish: a worker whose final
+            # metrics payload overflows the queue's buffer blocks at exit
+            # until someone reads it, so joining before draining can
+            # deadlock (the documented mp "joining processes that use
+            # queues" trap). Drained dicts are handed to collect_metrics.
+            try:
+                while True:
+                    self._pending_metrics.append(self.metrics_queue.get_nowait())
+            except Empty:
+                pass
+            if deadline and time.time() > deadline:
+                return False
+            time.sleep(sleep_s)
+            sleep_s = min(0.5, sleep_s * 1.5)
+        return True
+
     def stop(self, force: bool = False):
         """Signal all workers to stop and wait for them to send metrics."""
         self.stop_signal.value = True
@@ -359,7 +640,9 @@ class LocustRunner:
         Args:
             timeout: Time to wait for metrics from each worker
         """
-        worker_metrics = []
+        # Start from whatever join_workers already drained
+        worker_metrics = self._pending_metrics
+        self._pending_metrics = []
         # Wait for metrics from all workers
         expected_workers = self.num_workers
         deadline = time.time() + timeout
@@ -393,12 +676,16 @@ class LocustRunner:
             if 'search_ids' in m:
                 search_ids.update(m['search_ids'])
         
-        # Aggregate latencies from all workers
+        # Merge the workers' sample reservoirs; the old reconstruction
+        # (each worker's average duplicated request_count times) flattened
+        # the distribution and made the global percentiles meaningless
         all_latencies = []
+        latency_sum = 0.0
+        latency_count = 0
         for m in worker_metrics:
-            # Reconstruct latencies from percentiles (approximate)
-            if m['avg_latency_ms'] > 0:
-                all_latencies.extend([m['avg_latency_ms']] * m['request_count'])
+            all_latencies.extend(m.pop('latency_samples', []))
+            latency_sum += m.get('latency_sum', 0.0)
+            latency_count += m.get('latency_count', 0)
 
         all_latencies = sorted(all_latencies) if all_latencies else [0]
 
@@ -413,7 +700,7 @@ class LocustRunner:
             "total_errors": total_errors,
             "success_rate": total_success / (total_success + total_fail) if (total_success + total_fail) > 0 else 0,
             "throughput": total_throughput,
-            "avg_latency_ms": sum(all_latencies) / len(all_latencies) if all_latencies else 0,
+            "avg_latency_ms": latency_sum / latency_count if latency_count else 0,
             "p50_latency_ms": all_latencies[int(len(all_latencies) * 0.5)] if all_latencies else 0,
             "p95_latency_ms": all_latencies[int(len(all_latencies) * 0.95)] if len(all_latencies) > 1 else all_latencies[0],
             "p99_latency_ms": all_latencies[int(len(all_latencies) * 0.99)] if len(all_latencies) > 1 else all_latencies[0],
@@ -422,16 +709,19 @@ class LocustRunner:
             "search_ids": search_ids
         }
 
-        # Aggregate took times for search operations
+        # Aggregate took times for search operations, merging reservoirs
+        # the same way as latencies
         all_took_times = []
+        took_sum = 0.0
+        took_count = 0
         for m in worker_metrics:
-            if 'avg_took_ms' in m:
-                # Reconstruct took times from averages (approximate)
-                all_took_times.extend([m['avg_took_ms']] * m['request_count'])
+            all_took_times.extend(m.pop('took_samples', []))
+            took_sum += m.get('took_sum', 0.0)
+            took_count += m.get('took_count', 0)
 
         if all_took_times:
             all_took_times = sorted(all_took_times)
-            result["avg_took_ms"] = sum(all_took_times) / len(all_took_times)
+            result["avg_took_ms"] = took_sum / took_count if took_count else 0
             result["p50_took_ms"] = all_took_times[int(len(all_took_times) * 0.5)]
             result["p95_took_ms"] = all_took_times[int(len(all_took_times) * 0.95)] if len(all_took_times) > 1 else all_took_times[0]
             result["p99_took_ms"] = all_took_times[int(len(all_took_times) * 0.99)] if len(all_took_times) > 1 else all_took_times[0]
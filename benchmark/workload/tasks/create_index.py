@@ -20,5 +20,7 @@ class CreateIndexTask(Task):
         
         # Load and create index
         body = self._load_payload()
-        logger.info(f"Creating index:{index_name} with body:{body}") 
+        # %s-style args defer the body repr until a handler wants it
+        logger.info("Creating index:%s", index_name)
+        logger.debug("Index body: %s", body)
         index.create(body)
@@ -13,5 +13,6 @@ class CreateIngestPipelineTask(Task):
             raise ValueError("'ingest-pipeline' parameter is required")
         
         body = self._load_payload()
-        logger.info(f"Creating ingest pipeline: {pipeline_name}")
+        logger.info("Creating ingest pipeline: %s", pipeline_name)
+        logger.debug("Pipeline body: %s", body)
         return client.http.put(f"/_ingest/pipeline/{pipeline_name}", body=body)
@@ -13,5 +13,6 @@ class CreateSearchPipelineTask(Task):
             raise ValueError("'search-pipeline' parameter is required")
         
         body = self._load_payload()
-        logger.info(f"Creating search pipeline: {pipeline_name}")
+        logger.info("Creating search pipeline: %s", pipeline_name)
+        logger.debug("Pipeline body: %s", body)
         return client.http.put(f"/_search/pipeline/{pipeline_name}", body=body)
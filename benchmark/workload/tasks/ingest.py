@@ -43,6 +43,11 @@ class IngestTask(RunnerTask):
             total_count = int(total_count)
             doc_generator_kwargs = {"total_count": total_count}
 
+        if self.parameters.get('ingest_mode') == 'bulk':
+            return self._execute_parallel_bulk(
+                index_name, doc_generator, doc_generator_kwargs, clients
+            )
+
         metrics = self.runner.run(
             data_generator=doc_generator(**doc_generator_kwargs),
             user_count=clients,
@@ -53,3 +58,40 @@ class IngestTask(RunnerTask):
         self.print_report(metrics)
         return metrics
 
+    def _execute_parallel_bulk(self, index_name, doc_generator, doc_generator_kwargs, clients):
+        """Drive ingestion through opensearch-py's parallel_bulk helper.
+
+        A thread-per-client alternative to the multiprocessing runner
+        (ingest_mode: bulk) for hosts where spawning worker processes is
+        undesirable. Batches flush on whichever of `bulk_size` docs or
+        `bulk_max_bytes` is hit first.
+        """
+        from opensearchpy.helpers import parallel_bulk
+        from benchmark.basic import client
+
+        bulk_size = int(self.parameters.get('bulk_size', 100))
+        max_chunk_bytes = int(self.parameters.get('bulk_max_bytes', 100 * 1024 * 1024))
+
+        def actions():
+            for doc_id, doc_body in doc_generator(**doc_generator_kwargs):
+                yield {"_index": index_name, "_id": doc_id, "_source": doc_body}
+
+        success = 0
+        fail = 0
+        for ok, item in parallel_bulk(
+            client,
+            actions(),
+            chunk_size=bulk_size,
+            max_chunk_bytes=max_chunk_bytes,
+            thread_count=clients,
+            raise_on_error=False,
+        ):
+            if ok:
+                success += 1
+            else:
+                fail += 1
+                logger.debug("bulk item failed: %s", item)
+
+        logger.info("parallel_bulk finished: %d ok, %d failed", success, fail)
+        return {"total_success": success, "total_fail": fail}
+
@@ -1,6 +1,7 @@
 """General purpose HTTP request task for OpenSearch."""
 
-from typing import Any
+from pathlib import Path
+from typing import Any, Dict
 from benchmark.workload.task import Task
 from benchmark.basic.my_logger import logger
 from benchmark.basic import client
@@ -17,21 +18,27 @@ class RequestTask(Task):
           url: /my-index/_settings
           payload: settings.json  # optional, for request body
     """
-    
-    def execute(self, results: list = None) -> Any:
-        method = self.config.get('method', 'GET').upper()
-        url = self.config.get('url')
-        
+
+    def __init__(self, name: str, config: Dict[str, Any], global_params: Dict[str, Any], workload_dir: Path):
+        super().__init__(name, config, global_params, workload_dir)
+        # Resolved once: method casing, the url template and its
+        # parameter substitution are constant for the task's lifetime
+        self._method = config.get('method', 'GET').upper()
+        url = config.get('url')
         if not url:
             raise ValueError("'url' is required for request task")
-        
         # Substitute parameters in URL (e.g., /{{index}}/_settings)
-        url = self._substitute_params(url)
+        self._url = self._substitute_params(url)
+
+    def execute(self, results: list = None) -> Any:
+        method = self._method
+        url = self._url
         
         # Load payload if specified
         body = self._load_payload()
         
-        logger.info(f"Executing {method} {url}, with payload {body}")
+        logger.info("Executing %s %s", method, url)
+        logger.debug("Request payload: %s", body)
         
         # Use the low-level transport to make the request
         response = client.transport.perform_request(
@@ -40,5 +47,5 @@ class RequestTask(Task):
             body=body
         )
         
-        logger.info(f"Request completed: {method} {url}")
+        logger.info("Request completed: %s %s", method, url)
         return response
@@ -9,8 +9,20 @@ from benchmark.workload.tasks.runner_type import RunnerType
 class RunnerTask(Task):
     def __init__(self, name: str, config: Dict[str, Any], global_params: Dict[str, Any], workload_dir: Path):
         super().__init__(name, config, global_params, workload_dir)
-        self.runner = LocustManager(global_params, runner_type=self.get_runner_type())
-        
+        self.global_params = global_params
+        self._runner = None
+
+    @property
+    def runner(self) -> LocustManager:
+        """Build the LocustManager on first use.
+
+        Workloads often declare more runner tasks than a run executes
+        (skip_tasks); skipped ones never pay for queue setup this way.
+        """
+        if self._runner is None:
+            self._runner = LocustManager(self.global_params, runner_type=self.get_runner_type())
+        return self._runner
+
     def get_runner_type(self) -> RunnerType:
         return RunnerType.UNKNOWN
 
@@ -9,6 +9,22 @@ from benchmark.basic.my_logger import logger
 from benchmark.workload.tasks.runner_type import RunnerType
 
 
+# Parsed truth files keyed by (path, mtime); repeated recall evaluations
+# in one session reuse the parse
+_TRUTH_CACHE: Dict[tuple, np.ndarray] = {}
+
+
+def _load_truth_file(truth_file):
+    key = (truth_file, os.stat(truth_file).st_mtime_ns)
+    correct = _TRUTH_CACHE.get(key)
+    if correct is None:
+        # dtype=int64 parses integers directly instead of going through a
+        # float64 intermediate array and an astype copy
+        correct = np.loadtxt(truth_file, delimiter=",", dtype=np.int64)
+        _TRUTH_CACHE[key] = correct
+    return correct
+
+
 class SearchTask(RunnerTask):
     """Task to execute search queries."""
 
@@ -17,13 +33,12 @@ class SearchTask(RunnerTask):
         super().__init__(name, config, global_params, workload_dir)
         if config.get('recall'):
             self.with_recall = True
-        self.runner.set_runner_type(RunnerType.SEARCH_WITH_RECALL if self.with_recall else RunnerType.SEARCH)
 
     def get_runner_type(self) -> RunnerType:
         if self.with_recall:
             return RunnerType.SEARCH_WITH_RECALL
         else:
-            return RunnerType.INGEST
+            return RunnerType.SEARCH
 
     def execute(self, results: list = None) -> Any:
         index_name = self.parameters.get('index')
@@ -78,14 +93,17 @@ class SearchTask(RunnerTask):
         """Convert search_ids dict to list of lists ordered by query_id."""
         if not search_ids:
             return []
-        # Get the maximum query_id to determine the size of the result list
-        max_query_id = max(int(query_id) for query_id in search_ids.keys())
-        # Initialize result list with empty lists
-        result = [[] for _ in range(max_query_id + 1)]
-        
-        # Fill the result list with document ids for each query_id
-        for query_id, doc_ids in search_ids.items():
-            result[int(query_id)] = doc_ids
+        # One int() pass instead of one for max() and one for placement
+        items = sorted((int(query_id), doc_ids) for query_id, doc_ids in search_ids.items())
+        # Dense ids (the normal case): the sorted rows are already in
+        # position, sized to the dict. With holes, fall back to
+        # index-aligned placement so rows keep lining up with the truth
+        # file in _evaluate.
+        if items[-1][0] == len(items) - 1:
+            return [doc_ids for _, doc_ids in items]
+        result = [[] for _ in range(items[-1][0] + 1)]
+        for query_id, doc_ids in items:
+            result[query_id] = doc_ids
         return result
 
     def _evaluate(self, search_ids, recall_params):
@@ -94,16 +112,36 @@ class SearchTask(RunnerTask):
         if not os.path.exists(truth_file):
             logger.error(f"truth file: {truth_file} does not exist")
             return
-        correct = np.loadtxt(truth_file, delimiter=",").astype(int)
+        correct = _load_truth_file(truth_file)
 
         data = self._convert_search_ids(search_ids)
         # Use the minimum size to avoid out of bounds
         eval_size = min(len(data), len(correct))
-        recalls = np.zeros(eval_size)
-        for i in range(eval_size):
-            data_set = set(int(x) for x in data[i])
-            correct_set = set(int(x) for x in correct[i])
-            recalls[i] = len(data_set & correct_set)
+        if eval_size == 0:
+            return 0.0
+        if correct.ndim == 1:
+            correct = correct.reshape(len(correct), -1)
+
+        # Pack the (possibly ragged) result rows into one int64 matrix,
+        # padding with -1 which never matches a doc id, then count the
+        # per-row overlap with np.isin - one C pass per query instead of
+        # building and intersecting two Python sets
+        width = max((len(row) for row in data[:eval_size]), default=0)
+        data_arr = np.full((eval_size, max(width, 1)), -1, dtype=np.int64)
+        for i, row in enumerate(data[:eval_size]):
+            if row:
+                data_arr[i, :len(row)] = row
+        # Shift each row into its own disjoint value range so a single
+        # flat searchsorted answers membership for every row at once; the
+        # -1 padding lands between ranges and can never match
+        corr_sorted = np.sort(correct[:eval_size].astype(np.int64), axis=1)
+        span = int(max(corr_sorted.max(), data_arr.max())) + 2
+        row_off = np.arange(eval_size, dtype=np.int64)[:, None] * span
+        flat_corr = (corr_sorted + row_off).ravel()
+        flat_data = (data_arr + row_off).ravel()
+        pos = np.searchsorted(flat_corr, flat_data).clip(max=flat_corr.size - 1)
+        hits = flat_corr[pos] == flat_data
+        recalls = hits.reshape(eval_size, -1).sum(axis=1)
         ret = np.mean(recalls) / float(size)
         return ret
 
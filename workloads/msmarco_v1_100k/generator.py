@@ -1,20 +1,36 @@
-import json
 from scipy.sparse import csr_matrix, vstack
 import numpy as np
+import os
 
 file_path = '/Users/xiliyun/projects/opensearch-sparse-benchmark/data/base_small.csr'
 
 def read_sparse_matrix_fields(fname):
     """read the fields of a CSR matrix without instanciating it"""
-    with open(fname, "rb") as f:
-        sizes = np.fromfile(f, dtype="int64", count=3)
-        nrow, ncol, nnz = sizes
-        indptr = np.fromfile(f, dtype="int64", count=nrow + 1)
-        assert nnz == indptr[-1]
-        indices = np.fromfile(f, dtype="int32", count=nnz)
+    # memmap instead of fromfile: the OS demand-pages the arrays in as
+    # rows are touched, so a multi-GB CSR doesn't get read and copied
+    # into RSS up front
+    mm = np.memmap(fname, dtype="u1", mode="r")
+    nrow, ncol, nnz = np.frombuffer(mm, dtype="int64", count=3)
+    offset = 24
+    indptr = np.frombuffer(mm, dtype="int64", count=nrow + 1, offset=offset)
+    offset += 8 * (nrow + 1)
+    assert nnz == indptr[-1]
+    indices = np.frombuffer(mm, dtype="int32", count=nnz, offset=offset)
+    offset += 4 * nnz
+    # The index-range sweep reads the entire nnz array off disk; record a
+    # sidecar marker after the first pass so later loads of the same
+    # (unchanged) file skip it
+    marker = fname + '.validated'
+    if not (os.path.exists(marker) and os.path.getmtime(marker) >= os.path.getmtime(fname)):
         assert np.all(indices >= 0) and np.all(indices < ncol)
-        data = np.fromfile(f, dtype="float32", count=nnz)
-        return data, indices, indptr, ncol
+        try:
+            open(marker, 'w').close()
+        except OSError:
+            # Read-only data mount: validation still ran, only the
+            # skip-next-time marker is lost
+            pass
+    data = np.frombuffer(mm, dtype="float32", count=nnz, offset=offset)
+    return data, indices, indptr, ncol
 
 
 def read_sparse_matrix(fname):
@@ -23,26 +39,48 @@ def read_sparse_matrix(fname):
 
     return csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, ncol))
 
-def sparse_vector_to_json(csr_matrix, row_idx=0):
-
-    # Get the first row as a sparse vector
-    vector = csr_matrix[row_idx]
-    
-    # Get nonzero elements and their indices
-    indices = vector.indices
-    data = vector.data
-    
-    # Create dictionary with string keys
-    result = {str(int(idx)): float(val) for idx, val in zip(indices, data)}
-    
-    # Convert to JSON
-    return result
+_cache = {}
+
+def _load(fname):
+    """Cache the raw CSR fields; benchmark data is read-only, so one
+    parse per (path, mtime, size) serves every run in this process."""
+    st = os.stat(fname)
+    key = (fname, st.st_mtime, st.st_size)
+    fields = _cache.get(key)
+    if fields is None:
+        fields = read_sparse_matrix_fields(fname)
+        _cache[key] = fields
+    return fields
+
+_keys = []
+
+def _key_table(ncol):
+    """String forms of every column id, built once per process.
+
+    Each lookup then reuses the same interned str object instead of
+    re-rendering str(idx) for every nonzero of every row.
+    """
+    global _keys
+    if len(_keys) < ncol:
+        _keys = [str(i) for i in range(ncol)]
+    return _keys
+
+def sparse_vector_to_json(indices, data, keys):
+    # tolist() converts the values in a single C loop and the key table
+    # turns each index into a pointer load; no per-nonzero str()/float()
+    return dict(zip(map(keys.__getitem__, indices.tolist()), data.tolist()))
 
 def doc_generator(**kwargs):
-    X = read_sparse_matrix(file_path)
-    size = kwargs.get('total_count', X.shape[0])
-    size = min(size, X.shape[0])
+    # Slice indptr/indices/data directly: csr_matrix[i] builds a new
+    # sparse matrix object per row, which dominates the per-row cost
+    data, indices, indptr, ncol = _load(file_path)
+    nrow = len(indptr) - 1
+    keys = _key_table(ncol)
+    size = kwargs.get('total_count', nrow)
+    size = min(size, nrow)
     for i in range(0, size):
-        vec = sparse_vector_to_json(X[i % X.shape[0]])
+        row = i % nrow
+        start, end = indptr[row], indptr[row + 1]
+        vec = sparse_vector_to_json(indices[start:end], data[start:end], keys)
         doc = {"passage_embedding": vec}
         yield (i, doc)
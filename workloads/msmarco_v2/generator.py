@@ -1,13 +1,19 @@
-import json
+import orjson
+import os
 
 file_path = '/Users/xiliyun/projects/opensearch-sparse-benchmark/data/msmarco_passage_69'
 
 def ms_marco_v2_generator():
-    with open(file_path, 'r', encoding='utf-8') as f:
+    # Binary mode skips the per-line utf-8 decode and str allocation;
+    # orjson tolerates the trailing newline, so no strip() either
+    with open(file_path, 'rb') as f:
+        # One sequential sweep: tell the kernel so it reads ahead
+        # aggressively instead of stalling per page
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
         for line in f:
-            line = line.strip()
-            if line:
-                yield json.loads(line)
+            if len(line) > 1:
+                yield orjson.loads(line)
 
 def doc_generator(**kwargs):
     total_count = kwargs.get('total_count')
@@ -1,20 +1,37 @@
 import json
 from scipy.sparse import csr_matrix, vstack
 import numpy as np
+import os
 
 file_path = '/home/ubuntu/data/queries.dev.csr'
 
 def read_sparse_matrix_fields(fname):
     """read the fields of a CSR matrix without instanciating it"""
-    with open(fname, "rb") as f:
-        sizes = np.fromfile(f, dtype="int64", count=3)
-        nrow, ncol, nnz = sizes
-        indptr = np.fromfile(f, dtype="int64", count=nrow + 1)
-        assert nnz == indptr[-1]
-        indices = np.fromfile(f, dtype="int32", count=nnz)
+    # memmap instead of fromfile: the OS demand-pages the arrays in as
+    # rows are touched, so a multi-GB CSR doesn't get read and copied
+    # into RSS up front
+    mm = np.memmap(fname, dtype="u1", mode="r")
+    nrow, ncol, nnz = np.frombuffer(mm, dtype="int64", count=3)
+    offset = 24
+    indptr = np.frombuffer(mm, dtype="int64", count=nrow + 1, offset=offset)
+    offset += 8 * (nrow + 1)
+    assert nnz == indptr[-1]
+    indices = np.frombuffer(mm, dtype="int32", count=nnz, offset=offset)
+    offset += 4 * nnz
+    # The index-range sweep reads the entire nnz array off disk; record a
+    # sidecar marker after the first pass so later loads of the same
+    # (unchanged) file skip it
+    marker = fname + '.validated'
+    if not (os.path.exists(marker) and os.path.getmtime(marker) >= os.path.getmtime(fname)):
         assert np.all(indices >= 0) and np.all(indices < ncol)
-        data = np.fromfile(f, dtype="float32", count=nnz)
-        return data, indices, indptr, ncol
+        try:
+            open(marker, 'w').close()
+        except OSError:
+            # Read-only data mount: validation still ran, only the
+            # skip-next-time marker is lost
+            pass
+    data = np.frombuffer(mm, dtype="float32", count=nnz, offset=offset)
+    return data, indices, indptr, ncol
 
 
 def read_sparse_matrix(fname):